@@ -1,125 +1,201 @@
-import subprocess
-import tempfile
-import os
 import asyncio
+import os
+import tempfile
+
+import mcp.server.stdio
 import mcp.types as types
-from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
-import mcp.server.stdio
-import base64
-from PIL import Image
-import io
+from mcp.server.models import InitializationOptions
 
-server = Server("illustrator")
+try:
+    import pybase64 as _b64
 
+    _b64encode = _b64.b64encode_as_string
+except ImportError:
+    import base64
 
-@server.list_tools()
-async def handle_list_tools() -> list[types.Tool]:
-    return [
-        types.Tool(
-            name="view",
-            description="View a screenshot of the Adobe Illustrator window",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "return_to_app": {
-                        "type": "string",
-                        "description": "App name to return to after screenshot (e.g., Terminal, ChatGPT, Claude, etc.)",
-                    }
+    def _b64encode(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+
+server = Server("illustrator")
+
+_TOOLS = [
+    types.Tool(
+        name="view",
+        description="View a screenshot of the Adobe Illustrator window",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "return_to_app": {
+                    "type": "string",
+                    "description": "App name to return to after screenshot (e.g., Terminal, ChatGPT, Claude, etc.)",
                 },
-            },
-        ),
-        types.Tool(
-            name="run",
-            description="Run ExtendScript code in Illustrator",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "code": {
-                        "type": "string",
-                        "description": "ExtendScript/JavaScript code to execute in Illustrator. It will run on the current document. You only need to make the document once.",
-                    }
+                "max_dim": {
+                    "type": "integer",
+                    "description": "Downscale the screenshot so neither side exceeds this many pixels. Useful when a small preview is enough.",
                 },
-                "required": ["code"],
             },
-        ),
-    ]
+        },
+    ),
+    types.Tool(
+        name="run",
+        description="Run ExtendScript code in Illustrator",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "code": {
+                    "type": "string",
+                    "description": "ExtendScript/JavaScript code to execute in Illustrator. It will run on the current document. You only need to make the document once.",
+                }
+            },
+            "required": ["code"],
+        },
+    ),
+]
 
 
-def captureIllustrator(return_to_app: str | None = None) -> list[types.TextContent | types.ImageContent]:
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-        screenshot_path = f.name
+@server.list_tools()
+async def handle_list_tools() -> list[types.Tool]:
+    return _TOOLS
 
+
+_APPLESCRIPT_ESCAPES = str.maketrans({'"': '\\"', "\\": "\\\\"})
+_RUN_SCRIPT_TEMPLATE = b'tell application "Adobe Illustrator"\n do javascript "%b"\nend tell\n'
+
+_SCREENSHOT_PATH = os.path.join(tempfile.gettempdir(), f"illustrator-mcp-{os.getpid()}.jpg")
+_screenshot_lock = asyncio.Lock()
+
+
+def _removeScreenshot() -> None:
     try:
-        activate_script = """
-            tell application "Adobe Illustrator" to activate
-            delay 1
-        """
-        if return_to_app:
-            activate_script += f'tell application "{return_to_app}" to activate\n'
+        os.unlink(_SCREENSHOT_PATH)
+    except FileNotFoundError:
+        pass
+
+
+async def _osascript(script: bytes) -> tuple[int, str, str]:
+    proc = await asyncio.create_subprocess_exec(
+        "osascript",
+        "-",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate(script)
+    return proc.returncode, stdout.decode(), stderr.decode()
 
-        subprocess.run(["osascript", "-e", activate_script])
 
-        result = subprocess.run(
-            [
+async def _isIllustratorFrontmost() -> bool:
+    returncode, stdout, _ = await _osascript(
+        b'tell application "Adobe Illustrator" to return frontmost'
+    )
+    return returncode == 0 and stdout.strip() == "true"
+
+
+async def captureIllustrator(
+    return_to_app: str | None = None, max_dim: int | None = None
+) -> list[types.TextContent | types.ImageContent]:
+    if not await _isIllustratorFrontmost():
+        await _osascript(b'tell application "Adobe Illustrator" to activate')
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 1
+        while loop.time() < deadline and not await _isIllustratorFrontmost():
+            await asyncio.sleep(0.05)
+
+    if return_to_app:
+        await _osascript(f'tell application "{return_to_app}" to activate'.encode())
+
+    async with _screenshot_lock:
+        try:
+            proc = await asyncio.create_subprocess_exec(
                 "screencapture",
+                "-t",
+                "jpg",
                 "-R",
                 "0,0,960,1080",
                 "-C",
                 "-T",
                 "2",
                 "-x",
-                screenshot_path,
-            ]
-        )
-
-        if result.returncode != 0:
-            return [types.TextContent(type="text", text="Failed to capture screenshot")]
-
-        with Image.open(screenshot_path) as img:
-            if img.mode in ("RGBA", "LA"):
-                img = img.convert("RGB")
-            buffer = io.BytesIO()
-            img.save(buffer, format="JPEG", quality=50, optimize=True)
-            compressed_data = buffer.getvalue()
-            screenshot_data = base64.b64encode(compressed_data).decode("utf-8")
-
-        return [
-            types.ImageContent(
-                type="image",
-                mimeType="image/jpeg",
-                data=screenshot_data,
+                _SCREENSHOT_PATH,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
-        ]
-
-    finally:
-        if os.path.exists(screenshot_path):
-            os.unlink(screenshot_path)
+            await proc.communicate()
+
+            if proc.returncode != 0:
+                return [types.TextContent(type="text", text="Failed to capture screenshot")]
+
+            if max_dim:
+                proc = await asyncio.create_subprocess_exec(
+                    "sips",
+                    "-g",
+                    "pixelWidth",
+                    "-g",
+                    "pixelHeight",
+                    _SCREENSHOT_PATH,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                stdout, _ = await proc.communicate()
+                size = [
+                    int(line.split(":")[1])
+                    for line in stdout.decode().splitlines()
+                    if line.strip().startswith(("pixelWidth:", "pixelHeight:"))
+                ]
+
+                if proc.returncode != 0 or len(size) != 2:
+                    return [types.TextContent(type="text", text="Failed to resize screenshot")]
+
+                if max(size) > max_dim:
+                    proc = await asyncio.create_subprocess_exec(
+                        "sips",
+                        "-Z",
+                        str(max_dim),
+                        _SCREENSHOT_PATH,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                    )
+                    await proc.communicate()
+
+                    if proc.returncode != 0:
+                        return [types.TextContent(type="text", text="Failed to resize screenshot")]
+
+            try:
+                with open(_SCREENSHOT_PATH, "rb") as fh:
+                    compressed_data = fh.read()
+            except FileNotFoundError:
+                return [types.TextContent(type="text", text="Failed to capture screenshot")]
+        finally:
+            _removeScreenshot()
+
+    screenshot_data = _b64encode(compressed_data)
 
+    return [
+        types.ImageContent(
+            type="image",
+            mimeType="image/jpeg",
+            data=screenshot_data,
+        )
+    ]
 
-def runIllustratorScript(code: str) -> list[types.TextContent]:
-    script = code.replace('"', '\\"').replace("\n", "\\n")
 
-    applescript = f"""
-        tell application "Adobe Illustrator"
-            do javascript "{script}"
-        end tell
-    """
+async def runIllustratorScript(code: str) -> list[types.TextContent]:
+    script = code.translate(_APPLESCRIPT_ESCAPES)
 
-    result = subprocess.run(
-        ["osascript", "-e", applescript], capture_output=True, text=True
-    )
+    returncode, stdout, stderr = await _osascript(_RUN_SCRIPT_TEMPLATE % script.encode())
 
-    if result.returncode != 0:
+    if returncode != 0:
         return [
             types.TextContent(
-                type="text", text=f"Error executing script: {result.stderr}"
+                type="text", text=f"Error executing script: {stderr}"
             )
         ]
 
     success_message = "Script executed successfully"
-    if result.stdout:
-        success_message += f"\nOutput: {result.stdout}"
+    if stdout:
+        success_message += f"\nOutput: {stdout}"
 
     return [types.TextContent(type="text", text=success_message)]
 
@@ -129,11 +205,19 @@ async def handleCallTool(
     name: str, arguments: dict | None
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
     if name == "view":
-        return captureIllustrator(arguments.get("return_to_app") if arguments else None)
+        if not arguments:
+            return await captureIllustrator()
+        max_dim = arguments.get("max_dim")
+        if max_dim is not None and (
+            not isinstance(max_dim, int) or isinstance(max_dim, bool) or max_dim <= 0
+        ):
+            return [types.TextContent(type="text", text="max_dim must be a positive integer")]
+        return await captureIllustrator(arguments.get("return_to_app"), max_dim)
     elif name == "run":
-        if not arguments or "code" not in arguments:
+        code = (arguments or {}).get("code")
+        if not isinstance(code, str) or not code.strip():
             return [types.TextContent(type="text", text="No code provided")]
-        return runIllustratorScript(arguments["code"])
+        return await runIllustratorScript(code)
     else:
         raise ValueError(f"Unknown tool: {name}")
 